@@ -3,8 +3,12 @@ import os
 from google import genai
 from datetime import datetime
 import re
+import sys
+from history import history_totals
+from display import load_and_display_dashboard
 
 USER_DATA_FILE = "./data/user_data.json"
+HISTORY_LOG_FILE = "./data/history_app_data.json"
 CHECK_INTERVAL_SECONDS = 0.5
 ANALYZE_INTERVAL_SECONDS = 10  # 10s for testing, change to 300s later
 SYSTEM_PROMPT = """
@@ -100,6 +104,17 @@ def maybe_trigger_analysis(log_path):
     now = datetime.now()
     analyze_worker(log_path)
 
+def analyze_history(days=30):
+    """
+    Runs the analysis over the columnar history of the last `days` days instead of app_data.json.
+    From the command line: python analyze.py [days]
+    """
+    logs = history_totals(days)
+    os.makedirs(os.path.dirname(HISTORY_LOG_FILE), exist_ok=True)
+    with open(HISTORY_LOG_FILE, "w", encoding="utf-8") as f:
+        json.dump(logs, f, indent=2, ensure_ascii=False)
+    analyze_data(HISTORY_LOG_FILE)
+
 # Load your log JSON from file
 def analyze_data(log_path):
     api_key = os.getenv("GEMINI_API_KEY")
@@ -128,3 +143,8 @@ def analyze_data(log_path):
     except Exception as e:
         print(f"[ANALYZE] Could not parse/save response: {e}")
         print("Raw output:", raw_output)
+
+if __name__ == "__main__":
+    # Usage: python analyze.py [days] - analyze the last `days` days of history and show the dashboard
+    analyze_history(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
+    load_and_display_dashboard(USER_DATA_FILE)
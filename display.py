@@ -3,16 +3,20 @@ from tkinter import ttk
 import json
 from datetime import datetime
 
+SPARKLINE_WINDOW_SECONDS = 3600
+SPARKLINE_BUCKETS = 60
+
 class ProductivityDashboard:
-    def __init__(self, data):
+    def __init__(self, data, timeline=None):
         self.data = data
+        self.timeline = timeline
         self.root = tk.Tk()
         self.setup_window()
         self.create_widgets()
     
     def setup_window(self):
         self.root.title("Productivity Dashboard")
-        self.root.geometry("500x600")
+        self.root.geometry("500x680" if self.timeline is not None else "500x600")
         self.root.resizable(False, False)
         
         # Set color scheme
@@ -43,6 +47,10 @@ class ProductivityDashboard:
         # Summary section
         self.create_summary_section(main_frame)
         
+        # Recent activity sparkline
+        if self.timeline is not None:
+            self.create_sparkline_section(main_frame)
+        
         # Apps section
         self.create_apps_section(main_frame)
         
@@ -86,6 +94,37 @@ class ProductivityDashboard:
         score_label = ttk.Label(grid_frame, text=score_text, style="Data.TLabel")
         score_label.grid(row=3, column=1, sticky="w")
     
+    def create_sparkline_section(self, parent):
+        # Sparkline frame
+        sparkline_frame = ttk.LabelFrame(parent, text="Last Hour (productive share per minute)", padding="10")
+        sparkline_frame.pack(fill="x", pady=(0, 10))
+        
+        width, height = 440, 50
+        canvas = tk.Canvas(sparkline_frame, width=width, height=height, bg="#ffffff", highlightthickness=0)
+        canvas.pack(fill="x")
+        
+        ratios = self.timeline.sparkline(SPARKLINE_WINDOW_SECONDS, SPARKLINE_BUCKETS)
+        if all(ratio is None for ratio in ratios):
+            canvas.create_text(width / 2, height / 2, text="No recent activity yet", fill="#888888")
+        step = width / SPARKLINE_BUCKETS
+        
+        # Draw one segment per run of non-empty buckets
+        points = []
+        for i, ratio in enumerate(ratios + [None]):
+            if ratio is None:
+                if len(points) >= 4:
+                    canvas.create_line(*points, fill="#2d8c2d", width=2)
+                elif len(points) == 2:
+                    canvas.create_oval(points[0] - 1, points[1] - 1, points[0] + 1, points[1] + 1,
+                                       fill="#2d8c2d", outline="")
+                points = []
+            else:
+                points.extend((i * step + step / 2, height - 2 - ratio * (height - 4)))
+        
+        switches = self.timeline.switches_per_minute(SPARKLINE_WINDOW_SECONDS)
+        ttk.Label(sparkline_frame, text=f"App switches per minute: {switches:.1f}",
+                 style="Data.TLabel").pack(anchor="w")
+    
     def create_apps_section(self, parent):
         # Apps frame
         apps_frame = ttk.LabelFrame(parent, text="App Usage", padding="10")
@@ -138,13 +177,14 @@ class ProductivityDashboard:
     def run(self):
         self.root.mainloop()
 
-def load_and_display_dashboard(json_file_path=None, json_data=None):
+def load_and_display_dashboard(json_file_path=None, json_data=None, timeline=None):
     """
     Load productivity data and display dashboard
     
     Args:
         json_file_path (str): Path to JSON file
         json_data (dict): Direct JSON data (alternative to file)
+        timeline (ActivityTimeline): Recent samples for the sparkline (optional)
     """
     if json_data:
         data = json_data
@@ -163,7 +203,7 @@ def load_and_display_dashboard(json_file_path=None, json_data=None):
         return
     
     # Create and run dashboard
-    dashboard = ProductivityDashboard(data)
+    dashboard = ProductivityDashboard(data, timeline)
     dashboard.run()
 
 # Example usage
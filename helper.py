@@ -1,5 +1,8 @@
 import json
 import os
+from keywords import stats_sample_due, record_classification, excluded_keywords, prune_keywords
+from history import record_interval
+from uploader import enqueue_interval
 
 # --- Configuration and Constants ---
 CONFIG_FILE = './config.json'
@@ -11,20 +14,23 @@ def classify_window(window_title):
     with open(CONFIG_FILE, 'r') as file:
         config = json.load(file)
     productive_keywords = config.get("productive_keywords", [])
-    # unproductive_keywords = config.get("unproductive_keywords", [])
     
     title_lower = window_title.lower()
     if title_lower.strip() == "":
         return 'neutral'
 
+    # Every Nth classification scans all keywords to collect hit/conflict stats
+    if stats_sample_due():
+        unproductive_keywords = config.get("unproductive_keywords", [])
+        productive_matches = [keyword for keyword in productive_keywords if keyword.lower() in title_lower]
+        unproductive_matches = [keyword for keyword in unproductive_keywords if keyword.lower() in title_lower]
+        record_classification(productive_matches, unproductive_matches)
+        return 'productive' if productive_matches else 'unproductive'
+
     for keyword in productive_keywords:
         if keyword.lower() in title_lower:
             return 'productive'
     
-    # for keyword in unproductive_keywords:
-    #     if keyword.lower() in title_lower:
-    #         return 'unproductive'
-    
     return 'unproductive'
 
 def load_config():
@@ -47,7 +53,8 @@ def load_config():
                 "unproductive_keywords": ["youtube", "facebook", "instagram", "twitter", "tiktok", "netflix"],
                 "start_focus_session_in": 20,
                 "nudge_cooldown": 20,
-                "max_unproductive_session_time": 10
+                "max_unproductive_session_time": 10,
+                "max_active_keywords": 60
             }
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(default_config, f, indent=4)
@@ -75,9 +82,10 @@ def load_config():
         all_productive = config_file["productive_keywords"].copy()
         all_unproductive = config_file["unproductive_keywords"].copy()
         
-        # Add user keywords
+        # Add user keywords, except the ones pruning has demoted or retired
+        excluded = excluded_keywords(config_file)
         if isinstance(user_productive, list):
-            all_productive.extend(user_productive)
+            all_productive.extend(keyword for keyword in user_productive if keyword.lower() not in excluded)
         if isinstance(user_unproductive, list):
             all_unproductive.extend(user_unproductive)
         
@@ -96,6 +104,9 @@ def load_config():
         config_file["productive_keywords"] = remove_duplicates_case_insensitive(all_productive)
         config_file["unproductive_keywords"] = remove_duplicates_case_insensitive(all_unproductive)
         
+        # Score the keywords on collected hit statistics and prune the active set
+        prune_keywords(config_file)
+        
         print(f"Loaded {len(config_file['productive_keywords'])} productive keywords")
         print(f"Loaded {len(config_file['unproductive_keywords'])} unproductive keywords")
         
@@ -182,4 +193,12 @@ def log_activity(start_time, end_time, app_name, window_title=None):
 
     # Save back to file
     with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(logs, f, indent=2)
\ No newline at end of file
+        json.dump(logs, f, indent=2)
+
+    # Keep the raw interval for the columnar history and the team uploader as well,
+    # after app_data.json is saved so a failing export can never skip it
+    try:
+        record_interval(start_time, end_time, app_name, window_title)
+    except Exception as e:
+        print(f"[HISTORY] Could not record interval: {e}")
+    enqueue_interval(start_time, end_time, app_name, window_title)
\ No newline at end of file
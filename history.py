@@ -0,0 +1,309 @@
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# --- Configuration and Constants ---
+HISTORY_DIR = './data/history'
+HISTORY_FLUSH_SIZE = 50  # buffered intervals before they are written out
+HISTORY_MAX_PENDING = 10000  # buffered intervals kept while day files cannot be written
+MAGIC = b'GGHIST01'
+# row count, app count, title count, then byte offsets of the sections:
+# start, duration, app_id, title_id, app offsets, app blob, title offsets, title blob
+FOOTER = struct.Struct('<11Q')
+
+# Columns, in file order
+COLUMNS = (
+    ("start", np.dtype('<f8')),     # epoch seconds
+    ("duration", np.dtype('<f4')),  # seconds
+    ("app_id", np.dtype('<u4')),
+    ("title_id", np.dtype('<u4')),
+)
+
+_pending_intervals = []
+
+
+def day_path(day):
+    return os.path.join(HISTORY_DIR, f"{day.isoformat()}.ggh")
+
+
+def _align(f):
+    """Pads the file to an 8 byte boundary so every section can be viewed in place."""
+    padding = -f.tell() % 8
+    f.write(b'\0' * padding)
+    return f.tell()
+
+
+def _encode_strings(strings):
+    blobs = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(blobs) + 1, dtype='<u4')
+    offsets[1:] = np.cumsum([len(b) for b in blobs])
+    return offsets, b''.join(blobs)
+
+
+def _decode_strings(offsets, blob):
+    blob = bytes(blob)
+    return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+
+def write_day(path, start, duration, apps, app_id, titles, title_id):
+    """
+    Writes one day of intervals, sorted by start time.
+
+    Layout: MAGIC, the four fixed-width columns, the app and title dictionaries
+    (uint32 offsets + utf-8 blob), then the footer holding every section offset
+    and MAGIC again. Written to a temp file and swapped in, so readers never see
+    a half written day.
+    """
+    order = np.argsort(start, kind='stable')
+    columns = [np.ascontiguousarray(np.asarray(values)[order], dtype=dtype)
+               for values, (_, dtype) in zip((start, duration, app_id, title_id), COLUMNS)]
+    app_offsets, app_blob = _encode_strings(apps)
+    title_offsets, title_blob = _encode_strings(titles)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        section_offsets = []
+        for section in columns + [app_offsets, app_blob, title_offsets, title_blob]:
+            section_offsets.append(_align(f))
+            f.write(section if isinstance(section, bytes) else section.tobytes())
+        _align(f)
+        f.write(FOOTER.pack(len(order), len(apps), len(titles), *section_offsets))
+        f.write(MAGIC)
+    os.replace(tmp_path, path)
+
+
+class HistoryDay:
+    """
+    Memory-mapped reader for one day file.
+
+    start, duration, app_id and title_id are zero-copy NumPy views into the map;
+    the app and title dictionaries are only decoded when first accessed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.getsize(path) < 2 * len(MAGIC) + FOOTER.size:
+            raise ValueError(f"'{path}' is truncated")
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self._map[:len(MAGIC)]) != MAGIC or bytes(self._map[-len(MAGIC):]) != MAGIC:
+            raise ValueError(f"'{path}' is not an activity history file")
+        footer_start = len(self._map) - len(MAGIC) - FOOTER.size
+        self._data_end = footer_start
+        (self.count, self._app_count, self._title_count,
+         *offsets) = FOOTER.unpack(bytes(self._map[footer_start:footer_start + FOOTER.size]))
+        (start_off, duration_off, app_id_off, title_id_off,
+         self._app_offsets_off, self._app_blob_off,
+         self._title_offsets_off, self._title_blob_off) = offsets
+
+        self.start = self._view(start_off, COLUMNS[0][1], self.count)
+        self.duration = self._view(duration_off, COLUMNS[1][1], self.count)
+        self.app_id = self._view(app_id_off, COLUMNS[2][1], self.count)
+        self.title_id = self._view(title_id_off, COLUMNS[3][1], self.count)
+        self._apps = None
+        self._titles = None
+
+    def _view(self, offset, dtype, count):
+        end = offset + dtype.itemsize * count
+        if end > self._data_end:
+            raise ValueError(f"'{self.path}' is corrupt: section runs past the footer")
+        return self._map[offset:end].view(dtype)
+
+    def _strings(self, offsets_off, blob_off, count):
+        offsets = self._view(offsets_off, np.dtype('<u4'), count + 1)
+        if blob_off + int(offsets[-1]) > self._data_end:
+            raise ValueError(f"'{self.path}' is corrupt: dictionary runs past the footer")
+        return _decode_strings(offsets, self._map[blob_off:blob_off + offsets[-1]])
+
+    @property
+    def apps(self):
+        if self._apps is None:
+            self._apps = self._strings(self._app_offsets_off, self._app_blob_off, self._app_count)
+        return self._apps
+
+    @property
+    def titles(self):
+        if self._titles is None:
+            self._titles = self._strings(self._title_offsets_off, self._title_blob_off, self._title_count)
+        return self._titles
+
+    def rows_between(self, start_ts, end_ts):
+        """Slice of rows whose start falls in [start_ts, end_ts); the start column is sorted."""
+        first, last = np.searchsorted(self.start, [start_ts, end_ts])
+        return slice(int(first), int(last))
+
+    def close(self):
+        # Drop every view so the mmap is released (needed on Windows before os.replace)
+        self.start = self.duration = self.app_id = self.title_id = None
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_interval(start_time, end_time, app_name, window_title=None):
+    """Buffers one activity interval; flushed to the day files every HISTORY_FLUSH_SIZE intervals."""
+    _pending_intervals.append((start_time.timestamp(), (end_time - start_time).total_seconds(),
+                               app_name, window_title if window_title else app_name))
+    if len(_pending_intervals) >= HISTORY_FLUSH_SIZE:
+        flush_history()
+
+
+def flush_history():
+    """
+    Merges the buffered intervals into their day files. Never raises: a day that
+    cannot be written keeps its intervals buffered for the next flush.
+    """
+    if not _pending_intervals:
+        return
+    by_day = {}
+    for interval in _pending_intervals:
+        by_day.setdefault(datetime.fromtimestamp(interval[0]).date(), []).append(interval)
+    _pending_intervals.clear()
+
+    for day, intervals in by_day.items():
+        try:
+            _merge_day(day_path(day), intervals)
+        except Exception as e:
+            print(f"[HISTORY] Could not write {len(intervals)} intervals for {day.isoformat()}: {e}")
+            _pending_intervals.extend(intervals)
+
+    # Don't let a persistently failing export (e.g. a full disk) grow the buffer forever
+    if len(_pending_intervals) > HISTORY_MAX_PENDING:
+        print(f"[HISTORY] Dropping {len(_pending_intervals) - HISTORY_MAX_PENDING} oldest buffered intervals")
+        del _pending_intervals[:len(_pending_intervals) - HISTORY_MAX_PENDING]
+
+
+def _merge_day(path, intervals):
+    start, duration, apps, titles = [], [], [], []
+    if os.path.exists(path):
+        try:
+            with HistoryDay(path) as existing:
+                start = existing.start.tolist()
+                duration = existing.duration.tolist()
+                apps = [existing.apps[i] for i in existing.app_id]
+                titles = [existing.titles[i] for i in existing.title_id]
+        except (ValueError, IndexError) as e:
+            # Keep the damaged file around instead of silently overwriting it
+            print(f"Error: could not read '{path}': {e}, moving it to '{path}.corrupt'.")
+            os.replace(path, path + '.corrupt')
+            start, duration, apps, titles = [], [], [], []
+
+    for interval_start, interval_duration, app_name, title in intervals:
+        start.append(interval_start)
+        duration.append(interval_duration)
+        apps.append(app_name)
+        titles.append(title)
+
+    app_ids = {}
+    title_ids = {}
+    app_column = [app_ids.setdefault(app, len(app_ids)) for app in apps]
+    title_column = [title_ids.setdefault(title, len(title_ids)) for title in titles]
+    write_day(path, start, duration, list(app_ids), app_column, list(title_ids), title_column)
+
+
+def iter_history(days=30, end_day=None):
+    """Yields a HistoryDay for each existing day file in the last `days` days, oldest first."""
+    if end_day is None:
+        end_day = datetime.now().date()
+    for offset in range(days - 1, -1, -1):
+        path = day_path(end_day - timedelta(days=offset))
+        if not os.path.exists(path):
+            continue
+        try:
+            history_day = HistoryDay(path)
+        except ValueError as e:
+            print(f"Error: {e}, skipping it.")
+            continue
+        yield history_day
+
+
+def _add_day_totals(totals, history_day):
+    """Folds one day into per-title totals with vectorised group-bys over the title ids."""
+    if not history_day.count:
+        return
+    title_count = len(history_day.titles)
+    time_spent = np.bincount(history_day.title_id, weights=history_day.duration, minlength=title_count)
+    longest = np.zeros(title_count)
+    np.maximum.at(longest, history_day.title_id, history_day.duration)
+    last_active = np.zeros(title_count)
+    np.maximum.at(last_active, history_day.title_id, history_day.start + history_day.duration)
+
+    for title_id in np.flatnonzero(time_spent):
+        title = history_day.titles[title_id]
+        entry = totals.setdefault(title, {"app_name": title, "total_time_spent": 0.0,
+                                          "longest_session": 0.0, "last_active": 0.0})
+        entry["total_time_spent"] += float(time_spent[title_id])
+        entry["longest_session"] = max(entry["longest_session"], float(longest[title_id]))
+        entry["last_active"] = max(entry["last_active"], float(last_active[title_id]))
+
+
+def history_totals(days=30):
+    """
+    Per-title totals over the last `days` days, in the same shape as app_data.json
+    so the result can be handed straight to the analysis.
+    """
+    totals = {}
+    for history_day in iter_history(days):
+        with history_day:
+            try:
+                _add_day_totals(totals, history_day)
+            except (ValueError, IndexError) as e:
+                # The dictionaries are only decoded here, so corruption there shows up late
+                print(f"Error: could not read '{history_day.path}': {e}, skipping it.")
+
+    for entry in totals.values():
+        entry["total_time_spent"] = round(entry["total_time_spent"], 2)
+        entry["longest_session"] = round(entry["longest_session"], 2)
+        entry["last_active"] = datetime.fromtimestamp(entry["last_active"]).strftime('%Y-%m-%d %H:%M:%S')
+    return {"apps": list(totals.values())}
+
+
+def compare_with_json(path):
+    """Prints file size and parse + scan time of a day file against the same rows as pretty-printed JSON."""
+    with HistoryDay(path) as history_day:
+        rows = [{"app_name": history_day.apps[app], "window_title": history_day.titles[title],
+                 "start": start, "duration": duration}
+                for app, title, start, duration in zip(history_day.app_id.tolist(), history_day.title_id.tolist(),
+                                                       history_day.start.tolist(), history_day.duration.tolist())]
+    json_path = path + '.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2)
+
+    t0 = time.perf_counter()
+    with open(json_path, 'r', encoding='utf-8') as f:
+        json_total = sum(row["duration"] for row in json.load(f))
+    json_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with HistoryDay(path) as history_day:
+        columnar_total = float(history_day.duration.sum(dtype=np.float64))
+    columnar_seconds = time.perf_counter() - t0
+
+    json_size = os.path.getsize(json_path)
+    os.remove(json_path)
+    print(f"{len(rows)} intervals, total {json_total:.0f}s / {columnar_total:.0f}s")
+    print(f"JSON:     {json_size:>10} bytes  {json_seconds * 1000:8.2f} ms")
+    print(f"Columnar: {os.path.getsize(path):>10} bytes  {columnar_seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    # Usage: python history.py compare [YYYY-MM-DD]
+    if len(sys.argv) >= 2 and sys.argv[1] == "compare":
+        day = datetime.strptime(sys.argv[2], '%Y-%m-%d').date() if len(sys.argv) > 2 else datetime.now().date()
+        path = day_path(day)
+        if os.path.exists(path):
+            compare_with_json(path)
+        else:
+            print(f"No history recorded for {day.isoformat()} ('{path}' does not exist).")
+    else:
+        print("Usage: python history.py compare [YYYY-MM-DD]")
@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from ingest_server import IngestStore, create_server
+from uploader import send_batch, RETRY
+
+# --- Configuration and Constants ---
+DEFAULT_CLIENTS = 300
+DEFAULT_BATCHES_PER_CLIENT = 20
+DEFAULT_RECORDS_PER_BATCH = 200
+APPS = ["Code", "firefox", "Slack", "Terminal", "chrome", "Spotify"]
+
+
+def simulated_client(url, user, batches, records_per_batch, latencies, failures):
+    """One tracker instance: sends its batches back to back through the real uploader code."""
+    session = requests.Session()
+    start = time.time() - 86400
+    for _ in range(batches):
+        records = []
+        for _ in range(records_per_batch):
+            duration = round(random.uniform(1, 600), 2)
+            app = random.choice(APPS)
+            records.append({"start": start, "day": time.strftime('%Y-%m-%d', time.localtime(start)),
+                            "duration": duration, "app": app,
+                            "title": f"{app} - window {random.randint(0, 50)}"})
+            start += duration
+        t0 = time.perf_counter()
+        # Retry like the uploader does when the server sheds load
+        for attempt in range(10):
+            if send_batch(session, url, user, records) != RETRY:
+                break
+            time.sleep(0.05 * 2 ** attempt)
+        else:
+            failures.append(user)
+        latencies.append(time.perf_counter() - t0)
+
+
+def run_load_test(clients=DEFAULT_CLIENTS, batches=DEFAULT_BATCHES_PER_CLIENT,
+                  records_per_batch=DEFAULT_RECORDS_PER_BATCH):
+    """Starts a server on a temporary database and an ephemeral port, then hammers it with simulated clients."""
+    db_dir = tempfile.mkdtemp()
+    store = IngestStore(os.path.join(db_dir, "ingest.db"))
+    store.start()
+    server = create_server(store, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/ingest"
+
+    latencies = []
+    failures = []
+    threads = [threading.Thread(target=simulated_client,
+                                args=(url, f"user{i:04d}", batches, records_per_batch, latencies, failures))
+               for i in range(clients)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    accepted = time.perf_counter() - t0
+    server.shutdown()
+    server.server_close()
+    store.stop()
+    written = time.perf_counter() - t0
+
+    expected = (clients * batches - len(failures)) * records_per_batch
+    latencies.sort()
+    print(f"{clients} clients x {batches} batches x {records_per_batch} records")
+    print(f"Accepted in {accepted:.2f}s, written in {written:.2f}s: "
+          f"{store.rows_written / written:,.0f} records/s ({store.rows_written}/{expected} rows)")
+    print(f"Batch latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms, {len(failures)} batches failed")
+    print(f"Rollup rows: {len(store.rollups())}")
+
+
+if __name__ == "__main__":
+    # Usage: python ingest_loadtest.py [clients] [batches_per_client] [records_per_batch]
+    args = [int(arg) for arg in sys.argv[1:4]]
+    run_load_test(*args)
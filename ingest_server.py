@@ -0,0 +1,300 @@
+import json
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# --- Configuration and Constants ---
+INGEST_DB_FILE = './data/ingest.db'
+INGEST_HOST = '127.0.0.1'  # pass 0.0.0.0 on the command line to accept other workstations
+INGEST_PORT = 8765
+PENDING_BATCHES = 5000        # accepted batches waiting for the writer; beyond this clients get 503
+WRITE_MAX_BATCHES = 500       # batches combined into one transaction
+MAX_BODY_BYTES = 5 * 1024 * 1024
+MAX_DECOMPRESSED_BYTES = 20 * 1024 * 1024  # gzip bombs expand far beyond MAX_BODY_BYTES
+MAX_START_TIMESTAMP = 4102444800  # 2100-01-01, well inside what datetime.fromtimestamp accepts
+MAX_DURATION_SECONDS = 7 * 86400  # a window left open over a long weekend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intervals (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    start REAL NOT NULL,
+    duration REAL NOT NULL,
+    app TEXT,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS intervals_user_day ON intervals (user, day);
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    total_time REAL NOT NULL,
+    interval_count INTEGER NOT NULL,
+    PRIMARY KEY (user, day)
+);
+"""
+
+
+class IngestStore:
+    """
+    SQLite store fed by a single writer thread.
+
+    Request handlers only parse and queue batches; the writer drains up to
+    WRITE_MAX_BATCHES at a time and writes them in one transaction with bulk
+    inserts, updating the per-user/per-day rollup as it goes.
+    """
+
+    def __init__(self, db_path=INGEST_DB_FILE):
+        self.db_path = db_path
+        self.batches = queue.Queue(maxsize=PENDING_BATCHES)
+        self.rows_written = 0
+        self._stop_event = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="ingest-writer", daemon=True)
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self):
+        self._writer.start()
+
+    def stop(self):
+        """Stops the writer after everything queued so far is written."""
+        self._stop_event.set()
+        self._writer.join()
+
+    def submit(self, user, records):
+        """Queues a batch for writing. Returns False if the writer is too far behind."""
+        try:
+            self.batches.put_nowait((user, records))
+            return True
+        except queue.Full:
+            return False
+
+    def _write_loop(self):
+        connection = self._connect()
+        while not (self._stop_event.is_set() and self.batches.empty()):
+            try:
+                pending = [self.batches.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(pending) < WRITE_MAX_BATCHES:
+                try:
+                    pending.append(self.batches.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(connection, pending)
+            except Exception:
+                # Retry one batch at a time so a bad batch only loses itself, not the batches sharing its transaction
+                for user, records in pending:
+                    try:
+                        self._write(connection, [(user, records)])
+                    except Exception as e:
+                        print(f"[INGEST] Dropped a batch of {len(records)} records from '{user}': {e}")
+        connection.close()
+
+    def _write(self, connection, pending):
+        rows = []
+        rollup = {}
+        for user, records in pending:
+            for record in records:
+                # Group by the uploader's local day; older clients without it fall back to UTC
+                day = record.get("day") or \
+                    datetime.fromtimestamp(record["start"], timezone.utc).strftime('%Y-%m-%d')
+                rows.append((user, day, record["start"], record["duration"], record.get("app"), record.get("title")))
+                totals = rollup.setdefault((user, day), [0.0, 0])
+                totals[0] += record["duration"]
+                totals[1] += 1
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO intervals (user, day, start, duration, app, title) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany(
+                "INSERT INTO daily_rollup (user, day, total_time, interval_count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user, day) DO UPDATE SET "
+                "total_time = total_time + excluded.total_time, "
+                "interval_count = interval_count + excluded.interval_count",
+                [(user, day, total_time, count) for (user, day), (total_time, count) in rollup.items()])
+        self.rows_written += len(rows)
+
+    def rollups(self, user=None, day=None):
+        """Returns rollup rows, optionally filtered by user and/or day."""
+        query = "SELECT user, day, total_time, interval_count FROM daily_rollup WHERE 1=1"
+        params = []
+        if user:
+            query += " AND user = ?"
+            params.append(user)
+        if day:
+            query += " AND day = ?"
+            params.append(day)
+        connection = self._connect()
+        try:
+            rows = connection.execute(query + " ORDER BY day, user", params).fetchall()
+        finally:
+            connection.close()
+        return [{"user": u, "day": d, "total_time": round(t, 2), "interval_count": c} for u, d, t, c in rows]
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+def decompress_gzip(body, limit=MAX_DECOMPRESSED_BYTES):
+    """Inflates a gzip body, refusing to produce more than `limit` bytes."""
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        data = decompressor.decompress(body, limit + 1)
+    except zlib.error as e:
+        raise ValueError(f"could not decompress batch: {e}")
+    if len(data) > limit or decompressor.unconsumed_tail:
+        raise BatchTooLarge(f"batch expands to more than {limit} bytes")
+    if not decompressor.eof:
+        raise ValueError("could not decompress batch: truncated gzip stream")
+    return data
+
+
+def parse_batch(body, content_encoding=None):
+    """
+    Decodes an uploaded batch into (user, records); raises ValueError on anything
+    malformed, BatchTooLarge if it decompresses past MAX_DECOMPRESSED_BYTES.
+    """
+    if content_encoding == "gzip":
+        body = decompress_gzip(body)
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"could not decode batch: {e}")
+    if not isinstance(payload, dict) or not isinstance(payload.get("user"), str) \
+            or not isinstance(payload.get("records"), list):
+        raise ValueError("batch must be an object with 'user' and 'records'")
+    for record in payload["records"]:
+        if not isinstance(record, dict):
+            raise ValueError("every record must be an object")
+        start = record.get("start")
+        duration = record.get("duration")
+        # json.loads accepts NaN, Infinity and 1e300, none of which datetime can handle
+        if not isinstance(start, (int, float)) or isinstance(start, bool) or not math.isfinite(start) \
+                or not 0 <= start <= MAX_START_TIMESTAMP:
+            raise ValueError("every record needs a 'start' timestamp between 1970 and 2100")
+        if not isinstance(duration, (int, float)) or isinstance(duration, bool) or not math.isfinite(duration) \
+                or not 0 <= duration <= MAX_DURATION_SECONDS:
+            raise ValueError(f"every record needs a 'duration' between 0 and {MAX_DURATION_SECONDS} seconds")
+        for key in ("app", "title"):
+            if record.get(key) is not None and not isinstance(record[key], str):
+                raise ValueError(f"'{key}' must be a string")
+        if record.get("day") is not None:
+            try:
+                datetime.strptime(record["day"], '%Y-%m-%d')
+            except (TypeError, ValueError):
+                raise ValueError("'day' must be a YYYY-MM-DD date")
+    return payload["user"], payload["records"]
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, uploaders reuse their connection
+    store = None
+
+    def _reply(self, status, payload, close=False):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            # Also sets close_connection, so the unread body is never parsed as the next request
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reject(self, status, error):
+        """Replies without reading the body, so the connection must not be reused."""
+        self._reply(status, {"error": error}, close=True)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/ingest":
+            self._reject(404, "not found")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._reject(411, "Content-Length header missing or not a number")
+            return
+        if length <= 0:
+            self._reject(400, "empty batch")
+            return
+        if length > MAX_BODY_BYTES:
+            self._reject(413, "batch too large")
+            return
+        try:
+            user, records = parse_batch(self.rfile.read(length), self.headers.get("Content-Encoding"))
+        except BatchTooLarge as e:
+            self._reply(413, {"error": str(e)})
+            return
+        except ValueError as e:
+            self._reply(400, {"error": str(e)})
+            return
+        if not self.store.submit(user, records):
+            self._reply(503, {"error": "server busy, retry later"})
+            return
+        self._reply(202, {"accepted": len(records)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/rollups":
+            query = parse_qs(url.query)
+            self._reply(200, self.store.rollups(query.get("user", [None])[0], query.get("day", [None])[0]))
+        elif url.path == "/health":
+            self._reply(200, {"pending_batches": self.store.batches.qsize(), "rows_written": self.store.rows_written})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        # One line per request is far too noisy with hundreds of clients
+        pass
+
+
+class IngestServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default backlog of 5 refuses connections under bursts
+
+
+def create_server(store, host=INGEST_HOST, port=INGEST_PORT):
+    handler = type("BoundIngestHandler", (IngestHandler,), {"store": store})
+    return IngestServer((host, port), handler)
+
+
+def run_server(host=INGEST_HOST, port=INGEST_PORT, db_path=INGEST_DB_FILE):
+    store = IngestStore(db_path)
+    store.start()
+    server = create_server(store, host, port)
+    print(f"Ingestion server listening on http://{host}:{port}/ingest, writing to {db_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.stop()
+        print(f"\nIngestion server stopped. {store.rows_written} rows written.")
+
+
+if __name__ == "__main__":
+    # Usage: python ingest_server.py [port] [db_path] [host]
+    # Use host 0.0.0.0 to receive uploads from other workstations.
+    run_server(port=int(sys.argv[1]) if len(sys.argv) > 1 else INGEST_PORT,
+               db_path=sys.argv[2] if len(sys.argv) > 2 else INGEST_DB_FILE,
+               host=sys.argv[3] if len(sys.argv) > 3 else INGEST_HOST)
@@ -0,0 +1,252 @@
+import json
+import os
+
+# --- Configuration and Constants ---
+KEYWORD_STATS_FILE = './data/keyword_stats.json'
+KEYWORD_REPORT_FILE = './data/keyword_report.json'
+LOG_FILE = './data/app_data.json'
+DEFAULT_MAX_ACTIVE_KEYWORDS = 60
+KEYWORD_MIN_LENGTH = 3          # "py", "ai" etc. match inside far too many words
+STATS_SAMPLE_EVERY = 10         # only every Nth classification pays for a full keyword scan
+KEYWORD_MIN_OBSERVATIONS = 200  # sampled classifications a keyword must sit through before it counts as "never fires"
+KEYWORD_RETIRE_OBSERVATIONS = 2000  # sampled classifications a retired keyword stays excluded
+CONFLICT_MIN_HITS = 3
+CONFLICT_RATIO_THRESHOLD = 0.5  # demote if half or more of its hits were on mostly unproductive titles
+CONFLICT_PENALTY = 2
+
+# In-memory counters collected by classify_window, flushed to KEYWORD_STATS_FILE
+_pending_classifications = 0
+_pending_hits = {}
+_pending_conflicts = {}
+_classifications_since_sample = 0
+
+
+def stats_sample_due():
+    """True for every STATS_SAMPLE_EVERY-th classification, which should then report all its matches."""
+    global _classifications_since_sample
+    _classifications_since_sample += 1
+    if _classifications_since_sample >= STATS_SAMPLE_EVERY:
+        _classifications_since_sample = 0
+        return True
+    return False
+
+
+def record_classification(productive_matches, unproductive_matches):
+    """Counts one classification: every matching productive keyword gets a hit,
+    and a conflict as well if the title matched more unproductive keywords than
+    productive ones (e.g. "main" in "YouTube - funny meme compilation main")."""
+    global _pending_classifications
+    _pending_classifications += 1
+    for keyword in productive_matches:
+        _pending_hits[keyword] = _pending_hits.get(keyword, 0) + 1
+        if len(unproductive_matches) > len(productive_matches):
+            _pending_conflicts[keyword] = _pending_conflicts.get(keyword, 0) + 1
+
+
+def load_keyword_stats():
+    """Loads the persisted keyword statistics, or an empty structure."""
+    stats = {"classifications": 0, "keywords": {}}
+    if not os.path.exists(KEYWORD_STATS_FILE):
+        return stats
+    try:
+        with open(KEYWORD_STATS_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("keywords"), dict):
+            stats["classifications"] = data.get("classifications", 0)
+            stats["keywords"] = data["keywords"]
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode '{KEYWORD_STATS_FILE}', starting fresh.")
+    return stats
+
+
+def save_keyword_stats(stats):
+    os.makedirs(os.path.dirname(KEYWORD_STATS_FILE), exist_ok=True)
+    with open(KEYWORD_STATS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+
+
+def flush_keyword_stats():
+    """Merges the in-memory counters into the stats file and returns the merged stats."""
+    global _pending_classifications
+    stats = load_keyword_stats()
+    stats["classifications"] += _pending_classifications
+    for keyword, hits in _pending_hits.items():
+        entry = stats["keywords"].setdefault(keyword.lower(), {"hits": 0, "conflicts": 0, "first_seen": 0})
+        entry["hits"] += hits
+    for keyword, conflicts in _pending_conflicts.items():
+        entry = stats["keywords"].setdefault(keyword.lower(), {"hits": 0, "conflicts": 0, "first_seen": 0})
+        entry["conflicts"] += conflicts
+    _pending_classifications = 0
+    _pending_hits.clear()
+    _pending_conflicts.clear()
+    save_keyword_stats(stats)
+    return stats
+
+
+def excluded_keywords(config):
+    """Lower-cased keywords load_config must not merge back in: demoted ones, and retired ones until they expire."""
+    total = load_keyword_stats()["classifications"]
+    excluded = {keyword.lower() for keyword in config.get("demoted_keywords", [])}
+    excluded.update(keyword.lower() for keyword, retired_at in config.get("retired_keywords", {}).items()
+                    if total - retired_at < KEYWORD_RETIRE_OBSERVATIONS)
+    return excluded
+
+
+def score_keyword(entry):
+    return entry["hits"] - CONFLICT_PENALTY * entry["conflicts"]
+
+
+def prune_keywords(config):
+    """
+    Scores the active productive keywords and prunes the set in place.
+
+    - too short or conflicting keywords are moved to "demoted_keywords", which
+      load_config will not merge back in from Gemini suggestions
+    - keywords that never fired over KEYWORD_MIN_OBSERVATIONS classifications are moved
+      to "retired_keywords" for KEYWORD_RETIRE_OBSERVATIONS, then put back in the active
+      set with fresh counters (this includes keywords written into config.json by hand)
+    - the remaining set is capped at "max_active_keywords": keywords still inside their
+      observation window are always kept, the established ones compete on score and
+      the lowest scored are retired the same way
+
+    Bumps "keyword_set_version" and writes a report when the set changes.
+    Returns True if the active set changed.
+    """
+    stats = flush_keyword_stats()
+    total = stats["classifications"]
+    before = list(config.get("productive_keywords", []))
+    demoted = list(config.get("demoted_keywords", []))
+    demoted_lower = {keyword.lower() for keyword in demoted}
+    retired = {}
+    restored = []
+    before_lower = {keyword.lower() for keyword in before}
+    for keyword, retired_at in config.get("retired_keywords", {}).items():
+        if total - retired_at < KEYWORD_RETIRE_OBSERVATIONS:
+            retired[keyword] = retired_at
+        elif keyword.lower() not in before_lower and keyword.lower() not in demoted_lower:
+            # Retirement expired: give the keyword another chance
+            restored.append(keyword)
+            before_lower.add(keyword.lower())
+    max_active = config.get("max_active_keywords", DEFAULT_MAX_ACTIVE_KEYWORDS)
+
+    kept = []
+    removed = []
+    for keyword in before + restored:
+        key = keyword.lower()
+        # New keywords start their observation window now
+        entry = stats["keywords"].setdefault(key, {"hits": 0, "conflicts": 0, "first_seen": total})
+
+        if len(keyword.strip()) < KEYWORD_MIN_LENGTH or (
+                entry["hits"] >= CONFLICT_MIN_HITS
+                and entry["conflicts"] / entry["hits"] >= CONFLICT_RATIO_THRESHOLD):
+            if key not in demoted_lower:
+                demoted.append(keyword)
+                demoted_lower.add(key)
+            removed.append(keyword)
+        elif entry["hits"] == 0 and total - entry["first_seen"] >= KEYWORD_MIN_OBSERVATIONS:
+            retired[keyword] = total
+            removed.append(keyword)
+        else:
+            kept.append(keyword)
+
+    # Only established keywords compete for the cap; new ones (score 0 by construction) get their full window
+    established = [keyword for keyword in kept
+                   if total - stats["keywords"][keyword.lower()]["first_seen"] >= KEYWORD_MIN_OBSERVATIONS]
+    slots = max(max_active - (len(kept) - len(established)), 0)
+    if len(established) > slots:
+        # Stable sort keeps the original order among equally scored keywords
+        ranked = sorted(established, key=lambda k: score_keyword(stats["keywords"][k.lower()]), reverse=True)
+        capped = set(ranked[slots:])
+        for keyword in ranked[slots:]:
+            retired[keyword] = total
+            removed.append(keyword)
+        kept = [keyword for keyword in kept if keyword not in capped]
+
+    # Forget counters of retired keywords so they start fresh once the retirement expires
+    for keyword in removed:
+        if keyword.lower() not in demoted_lower:
+            stats["keywords"].pop(keyword.lower(), None)
+    save_keyword_stats(stats)
+
+    # Sort so that keywords with the most hits are checked first and classify_window exits early
+    kept.sort(key=lambda k: stats["keywords"][k.lower()]["hits"], reverse=True)
+    config["productive_keywords"] = kept
+    config["retired_keywords"] = retired
+    if not removed and not restored:
+        return False
+
+    config["demoted_keywords"] = demoted
+    config["keyword_set_version"] = config.get("keyword_set_version", 0) + 1
+    print(f"Pruned {len(removed)} keywords, restored {len(restored)}, {len(kept)} active (keyword set v{config['keyword_set_version']})")
+
+    report = keyword_pruning_report(before, kept, config.get("unproductive_keywords", []))
+    report["version"] = config["keyword_set_version"]
+    report["removed"] = removed
+    report["restored"] = restored
+    os.makedirs(os.path.dirname(KEYWORD_REPORT_FILE), exist_ok=True)
+    with open(KEYWORD_REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return True
+
+
+def _evaluate(titles, productive_keywords, unproductive_keywords):
+    """Replays classification over (title, seconds) pairs and returns cost and accuracy figures."""
+    productive_lower = [keyword.lower() for keyword in productive_keywords]
+    unproductive_lower = [keyword.lower() for keyword in unproductive_keywords]
+    checks = 0
+    labels = {}
+    conflicting_time = 0.0
+    for title, seconds in titles:
+        title_lower = title.lower()
+        label = 'unproductive'
+        for keyword in productive_lower:
+            checks += 1
+            if keyword in title_lower:
+                label = 'productive'
+                break
+        if label == 'productive':
+            productive_count = sum(1 for keyword in productive_lower if keyword in title_lower)
+            unproductive_count = sum(1 for keyword in unproductive_lower if keyword in title_lower)
+            if unproductive_count > productive_count:
+                conflicting_time += seconds
+        labels[title] = label
+    return checks, labels, conflicting_time
+
+
+def keyword_pruning_report(before, after, unproductive_keywords):
+    """
+    Compares two keyword sets against the titles in app_data.json.
+
+    Cost is the number of substring checks classify_window does per title when it
+    is not taking a stats sample, i.e. up to the first productive match.
+    Accuracy is approximated by the tracked time labelled productive although
+    the title matches more unproductive keywords than productive ones.
+    """
+    titles = []
+    if os.path.exists(LOG_FILE):
+        try:
+            with open(LOG_FILE, 'r', encoding='utf-8') as f:
+                logs = json.load(f)
+            titles = [(app["app_name"], app["total_time_spent"]) for app in logs.get("apps", [])]
+        except (json.JSONDecodeError, KeyError, AttributeError):
+            print(f"Error: Could not read '{LOG_FILE}' for the keyword report.")
+
+    checks_before, labels_before, conflicting_before = _evaluate(titles, before, unproductive_keywords)
+    checks_after, labels_after, conflicting_after = _evaluate(titles, after, unproductive_keywords)
+    changed = [title for title in labels_before if labels_before[title] != labels_after[title]]
+    count = max(len(titles), 1)
+
+    report = {
+        "titles_evaluated": len(titles),
+        "keywords_before": len(before),
+        "keywords_after": len(after),
+        "avg_checks_before": round(checks_before / count, 2),
+        "avg_checks_after": round(checks_after / count, 2),
+        "conflicting_time_before": round(conflicting_before, 2),
+        "conflicting_time_after": round(conflicting_after, 2),
+        "relabelled_titles": changed,
+        "relabelled_time": round(sum(seconds for title, seconds in titles if title in changed), 2),
+    }
+    print(f"Keyword report: {report['avg_checks_before']} -> {report['avg_checks_after']} checks per title, "
+          f"{len(changed)} titles relabelled")
+    return report
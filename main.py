@@ -12,11 +12,15 @@ import json
 import os
 from datetime import datetime, timedelta
 from display import load_and_display_dashboard
+from timeline import ActivityTimeline
+from history import flush_history
+from uploader import start_uploader, stop_uploader
 
 USER_DATA_FILE = "./data/user_data.json"
 LOG_FILE = './data/app_data.json'
 CHECK_INTERVAL_SECONDS = 0.5
 ANALYZE_INTERVAL_SECONDS = 300  # Analyze every 5 minutes
+RECENT_WINDOW_SECONDS = 600  # Window for the rolling stats shown in nudges
 
 # def send_nudge_notification(distracting_app_title):
 #     """Sends a desktop notification to nudge the user back to a productive task."""
@@ -42,6 +46,7 @@ def main():
         return
 
     initialize_log_file()
+    start_uploader(config)
 
     # State variables
     last_window_title = None
@@ -55,6 +60,7 @@ def main():
     productive_start_time = None
     in_focus_session = False
     last_nudge_time = 0
+    timeline = ActivityTimeline()
     FOCUS_SESSION_THRESHOLD = config.get("start_focus_session_in", 5)
     NUDGE_COOLDOWN_SECONDS = config.get("nudge_cooldown", 5)
     MAX_UNPRODUCTIVE_SESSION_TIME = config.get("max_unproductive_session_time", 10)
@@ -121,7 +127,7 @@ def main():
                     cooldown = (time.time() - last_nudge_time)
                     if cooldown >= NUDGE_COOLDOWN_SECONDS:
                         if productive_session_end_warning_counter < 3:
-                            send_focus_session_end_warning()
+                            send_focus_session_end_warning(timeline.seconds_since_productive())
                         else:
                             print("Focus session ended due to unproductive activity.")
                             in_focus_session = False
@@ -134,7 +140,7 @@ def main():
                             end_time = datetime.now()
                             log_activity(activity_start_time, end_time, last_app_name, last_window_title)
                             analyze_data(LOG_FILE)
-                            load_and_display_dashboard(USER_DATA_FILE)
+                            load_and_display_dashboard(USER_DATA_FILE, timeline=timeline)
                             load_config()
                         productive_session_end_warning_counter += 1
                         last_nudge_time = time.time()
@@ -151,7 +157,8 @@ def main():
                     elapsed = (datetime.now() - unproductive_session_start).total_seconds()
                     if elapsed >= MAX_UNPRODUCTIVE_SESSION_TIME and cooldown >= NUDGE_COOLDOWN_SECONDS:
                         if unproductive_session_warning_counter < 3:
-                            send_nudge_notification(current_window_title)
+                            send_nudge_notification(current_window_title, timeline.productive_ratio(RECENT_WINDOW_SECONDS),
+                                                    RECENT_WINDOW_SECONDS)
                             last_nudge_time = time.time()
                             unproductive_session_warning_counter += 1
                         else:
@@ -162,10 +169,11 @@ def main():
                             end_time = datetime.now()
                             log_activity(activity_start_time, end_time, last_app_name, last_window_title)
                             analyze_data(LOG_FILE)
-                            load_and_display_dashboard(USER_DATA_FILE)
+                            load_and_display_dashboard(USER_DATA_FILE, timeline=timeline)
                             load_config()
                         print("You've been unproductive for a while. Time to focus!")
                         unproductive_session_start = None
+            timeline.append(current_app_name, current_window_category)
             print("Current Window Category: ",current_window_category)
             time.sleep(CHECK_INTERVAL_SECONDS)
 
@@ -180,11 +188,17 @@ def main():
         log_activity(activity_start_time, end_time, last_app_name, last_window_title)
             
         analyze_data(LOG_FILE)
-        load_and_display_dashboard(USER_DATA_FILE)
+        load_and_display_dashboard(USER_DATA_FILE, timeline=timeline)
         load_config()
         print("\nTracker stopped. Final activity logged.")
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
+    finally:
+        # Write out the intervals still buffered for the columnar history and the uploader
+        try:
+            flush_history()
+        finally:
+            stop_uploader()
 
 if __name__ == "__main__":
     main()
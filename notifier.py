@@ -1,10 +1,13 @@
 from plyer import notification
 
-def send_nudge_notification(window_title):
+def send_nudge_notification(window_title, recent_productive_ratio=None, recent_window_seconds=None):
+    message = f"You are watching: {window_title}"
+    if recent_productive_ratio is not None and recent_window_seconds:
+        message += f"\n{recent_productive_ratio * 100:.0f}% productive in the last {recent_window_seconds // 60:.0f} minutes"
     try:
         notification.notify(
             title="GET BACK TO WORK",
-            message=f"You are watching: {window_title}",
+            message=message,
             app_name="Productivity Tracker",
             timeout=5
         )
@@ -25,11 +28,14 @@ def send_focus_session_start_notification():
         print(f"Error sending) notification: {e}")
 
 
-def send_focus_session_end_warning():
+def send_focus_session_end_warning(seconds_since_productive=None):
+    message = "You have been productive for a while. Don't break the streak!"
+    if seconds_since_productive is not None:
+        message += f"\nLast productive activity {int(seconds_since_productive)}s ago"
     try:
         notification.notify(
             title="STAY FOCUSED",
-            message=f"You have been productive for a while. Don't break the streak!",
+            message=message,
             app_name="Productivity Tracker",
             timeout=3
         )
@@ -0,0 +1,137 @@
+import time
+from array import array
+
+# --- Configuration and Constants ---
+DEFAULT_CAPACITY = 7200  # one hour of samples at the 0.5s check interval
+CATEGORY_CODES = {'neutral': 0, 'productive': 1, 'unproductive': 2}
+
+
+class ActivityTimeline:
+    """
+    Fixed-size ring buffer of (timestamp, app id, category) samples.
+
+    Every column is a preallocated array, so memory does not grow with uptime.
+    Next to each sample we store running totals of productive samples, non-neutral
+    samples and app switches; any window count is then the difference of two
+    totals, found with a binary search on the (monotonic) timestamps.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._timestamps = array('d', [0.0]) * capacity
+        self._app_ids = array('I', [0]) * capacity
+        self._categories = array('b', [0]) * capacity
+        self._productive_totals = array('Q', [0]) * capacity
+        self._active_totals = array('Q', [0]) * capacity
+        self._switch_totals = array('Q', [0]) * capacity
+        self._app_names = {}
+        self._head = 0
+        self._size = 0
+        self._last_productive_time = None
+
+    def __len__(self):
+        return self._size
+
+    def app_id(self, app_name):
+        """Interns an app name into a small integer id."""
+        return self._app_names.setdefault(app_name, len(self._app_names))
+
+    def append(self, app_name, category, timestamp=None):
+        """Records one sample in O(1), overwriting the oldest once the buffer is full."""
+        if timestamp is None:
+            timestamp = time.time()
+        app_id = self.app_id(app_name)
+        code = CATEGORY_CODES.get(category, 0)
+
+        productive_total = active_total = switch_total = 0
+        if self._size:
+            last = (self._head - 1) % self.capacity
+            productive_total = self._productive_totals[last]
+            active_total = self._active_totals[last]
+            switch_total = self._switch_totals[last] + (app_id != self._app_ids[last])
+
+        i = self._head
+        self._timestamps[i] = timestamp
+        self._app_ids[i] = app_id
+        self._categories[i] = code
+        self._productive_totals[i] = productive_total + (code == 1)
+        self._active_totals[i] = active_total + (code != 0)
+        self._switch_totals[i] = switch_total
+
+        if code == 1:
+            self._last_productive_time = timestamp
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _slot(self, index):
+        """Maps a logical index (0 = oldest sample) to its position in the arrays."""
+        return (self._head - self._size + index) % self.capacity
+
+    def _first_index_since(self, since):
+        """Binary search for the oldest sample with timestamp >= since."""
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if self._timestamps[self._slot(mid)] < since:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _counts(self, start, end):
+        """Returns (productive, active, switches) for logical indices [start, end)."""
+        if start >= end:
+            return 0, 0, 0
+        first = self._slot(start)
+        last = self._slot(end - 1)
+        code = self._categories[first]
+        productive = self._productive_totals[last] - self._productive_totals[first] + (code == 1)
+        active = self._active_totals[last] - self._active_totals[first] + (code != 0)
+        switches = self._switch_totals[last] - self._switch_totals[first]
+        return productive, active, switches
+
+    def productive_ratio(self, window_seconds, now=None):
+        """Share of non-neutral samples in the last window_seconds that were productive, or None."""
+        if now is None:
+            now = time.time()
+        productive, active, _ = self._counts(self._first_index_since(now - window_seconds), self._size)
+        if not active:
+            return None
+        return productive / active
+
+    def switches_per_minute(self, window_seconds, now=None):
+        """App switches per minute over the last window_seconds, or over the time covered if that is shorter."""
+        if now is None:
+            now = time.time()
+        start = self._first_index_since(now - window_seconds)
+        if start >= self._size:
+            return 0.0
+        _, _, switches = self._counts(start, self._size)
+        covered = now - self._timestamps[self._slot(start)]
+        if covered <= 0:
+            return 0.0
+        return switches / (covered / 60)
+
+    def seconds_since_productive(self, now=None):
+        """Seconds since the last productive sample, or None if there was none yet."""
+        if self._last_productive_time is None:
+            return None
+        if now is None:
+            now = time.time()
+        return now - self._last_productive_time
+
+    def sparkline(self, window_seconds, buckets, now=None):
+        """Productive ratio per bucket over the last window_seconds, oldest first (None for empty buckets)."""
+        if now is None:
+            now = time.time()
+        width = window_seconds / buckets
+        ratios = []
+        start = self._first_index_since(now - window_seconds)
+        for bucket in range(1, buckets + 1):
+            end = self._first_index_since(now - window_seconds + bucket * width)
+            if bucket == buckets:
+                end = self._size
+            productive, active, _ = self._counts(start, end)
+            ratios.append(productive / active if active else None)
+            start = end
+        return ratios
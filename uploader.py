@@ -0,0 +1,134 @@
+import gzip
+import json
+import queue
+import random
+import socket
+import threading
+import time
+
+import requests
+
+# --- Configuration and Constants ---
+UPLOAD_QUEUE_SIZE = 10000     # intervals kept in memory while the server is unreachable
+UPLOAD_BATCH_SIZE = 200
+UPLOAD_BATCH_SECONDS = 30     # send a partial batch after this long
+UPLOAD_TIMEOUT_SECONDS = 10
+BACKOFF_INITIAL_SECONDS = 1
+BACKOFF_MAX_SECONDS = 300
+
+# Outcomes of send_batch
+SENT = "sent"
+REJECTED = "rejected"  # the server will never accept this batch
+RETRY = "retry"        # server busy/down or network error
+
+_queue = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+_stop_event = threading.Event()
+_worker = None
+_dropped = 0
+
+
+def start_uploader(config):
+    """
+    Starts the background uploader if "upload_url" is set in the config.
+    The user name sent with each batch is "upload_user", or the host name.
+    """
+    global _worker
+    url = config.get("upload_url")
+    if not url or _worker is not None:
+        return
+    user = config.get("upload_user") or socket.gethostname()
+    _stop_event.clear()
+    _worker = threading.Thread(target=_upload_loop, args=(url, user), name="uploader", daemon=True)
+    _worker.start()
+    print(f"Uploading activity to {url} as '{user}'")
+
+
+def stop_uploader(timeout=5):
+    """Asks the worker to send what it has and waits at most `timeout` seconds."""
+    global _worker
+    if _worker is None:
+        return
+    _stop_event.set()
+    _worker.join(timeout)
+    _worker = None
+
+
+def enqueue_interval(start_time, end_time, app_name, window_title=None):
+    """Queues one interval for upload. Never blocks: if the queue is full the interval is dropped."""
+    global _dropped
+    if _worker is None:
+        return
+    record = {
+        "start": start_time.timestamp(),
+        # The server rolls up per day in the workstation's own timezone
+        "day": start_time.strftime('%Y-%m-%d'),
+        "duration": round((end_time - start_time).total_seconds(), 2),
+        "app": app_name,
+        "title": window_title if window_title else app_name,
+    }
+    try:
+        _queue.put_nowait(record)
+    except queue.Full:
+        _dropped += 1
+        if _dropped % 100 == 1:
+            print(f"[UPLOAD] Queue full, dropped {_dropped} intervals so far")
+
+
+def _next_batch(batch):
+    """Tops the batch up from the queue until it is full, the batch window passes or we are stopping."""
+    deadline = time.time() + UPLOAD_BATCH_SECONDS
+    while len(batch) < UPLOAD_BATCH_SIZE and not _stop_event.is_set():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=min(remaining, 1)))
+        except queue.Empty:
+            continue
+    # Drain without waiting on the way out
+    while len(batch) < UPLOAD_BATCH_SIZE:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def send_batch(session, url, user, records):
+    """POSTs one gzip-compressed batch. Returns SENT, REJECTED (4xx) or RETRY (5xx, 408/429 or network errors)."""
+    body = gzip.compress(json.dumps({"user": user, "records": records}).encode('utf-8'))
+    try:
+        response = session.post(url, data=body, timeout=UPLOAD_TIMEOUT_SECONDS,
+                                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+    except requests.RequestException:
+        return RETRY
+    if response.status_code < 300:
+        return SENT
+    if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+        print(f"[UPLOAD] Server rejected a batch of {len(records)} intervals "
+              f"({response.status_code}: {response.text[:200]}), dropping it")
+        return REJECTED
+    return RETRY
+
+
+def _upload_loop(url, user):
+    session = requests.Session()
+    batch = []
+    backoff = BACKOFF_INITIAL_SECONDS
+    while True:
+        batch = _next_batch(batch)
+        if not batch:
+            if _stop_event.is_set():
+                return
+            continue
+        if send_batch(session, url, user, batch) != RETRY:
+            batch = []
+            backoff = BACKOFF_INITIAL_SECONDS
+            continue
+        if _stop_event.is_set():
+            print(f"[UPLOAD] Server unreachable, {len(batch) + _queue.qsize()} intervals not uploaded")
+            return
+        # Keep the failed batch and retry with exponential backoff plus jitter
+        print(f"[UPLOAD] Upload failed, retrying in {backoff}s")
+        _stop_event.wait(backoff + random.uniform(0, backoff / 2))
+        backoff = min(backoff * 2, BACKOFF_MAX_SECONDS)